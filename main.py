@@ -1,26 +1,34 @@
+import logging
 import sys
-from dataclasses import dataclass
+import time
+import weakref
+from bisect import bisect_left, bisect_right
 from contextlib import contextmanager
+from functools import lru_cache, partial
 
 from PySide6.QtCore import (
     QAbstractItemModel,
+    QAbstractProxyModel,
+    QItemSelectionModel,
     QModelIndex,
     QRegularExpression,
-    QSortFilterProxyModel,
     Qt,
-    Signal, QDate, QDateTime, QTime, QByteArray,
+    Signal, Slot, QDate, QDateTime, QTime, QByteArray, QTimer,
 )
 from PySide6.QtGui import (
     QAction,
+    QActionGroup,
     QColor,
     QCursor,
     QFont,
     QKeySequence,
     QPixmap,
     QUndoCommand,
-    QUndoStack, QVector2D,
+    QUndoStack,
 )
 from PySide6.QtWidgets import (
+    QAbstractItemDelegate,
+    QAbstractItemView,
     QApplication,
     QColorDialog,
     QDateEdit,
@@ -45,17 +53,62 @@ from PySide6.QtWidgets import (
     QDockWidget,
     QComboBox,
     QPushButton,
-    QHBoxLayout
-, QKeySequenceEdit, QListWidget, QAbstractItemView, QListWidgetItem
-
+    QHBoxLayout,
+    QToolButton,
+    QKeySequenceEdit,
 )
 
+logger = logging.getLogger(__name__)
+
+# Roles queried on every repaint, compared as plain ints in PropertyModel.data()
+_DISPLAY = int(Qt.DisplayRole)
+_EDIT = int(Qt.EditRole)
+_BG = int(Qt.BackgroundRole)
+_DECORATION = int(Qt.DecorationRole)
+_DATA_ROLES = frozenset((_DISPLAY, _EDIT, _BG, _DECORATION))
+
+_COLUMN_COUNT = 2
+
+# Maximum number of closed editors a pooling delegate keeps around
+_EDITOR_POOL_SIZE = 4
+
+# Shared color constants; treat as immutable
+_BLACK = QColor(0, 0, 0)
+_DEFAULT_EVEN = _BLACK
+_DEFAULT_ODD = _BLACK
+
+# Shared invalid index used as the default/root parent in PropertyModel
+_ROOT = QModelIndex()
+
+_REGEX_METACHARS = frozenset(".^$*+?()[]{}|\\")
+
 
-@dataclass
 class PropertyItem:
-    name: str
-    value: any
-    type: str
+    __slots__ = ("name", "value", "type", "_cached_color", "_cached_text")
+
+    def __init__(self, name, value, type):
+        self.name = name
+        self.value = value
+        self.type = type
+        # (value, QColor) pair for color properties, rebuilt only when the value changes
+        self._cached_color = None
+        # (value, str) pair for tuple values such as vectors
+        self._cached_text = None
+
+    def color(self):
+        cached = self._cached_color
+        if cached is None or cached[0] != self.value:
+            cached = self._cached_color = (self.value, QColor(self.value))
+        return cached[1]
+
+    def displayText(self):
+        cached = self._cached_text
+        if cached is None or cached[0] != self.value:
+            cached = self._cached_text = (self.value, ",".join(map(str, self.value)))
+        return cached[1]
+
+    def __repr__(self):
+        return f"PropertyItem(name={self.name!r}, value={self.value!r}, type={self.type!r})"
 
 
 class SetRowColorCommand(QUndoCommand):
@@ -68,16 +121,18 @@ class SetRowColorCommand(QUndoCommand):
         self.setText(f"Change {color_type} row color from '{old_color.name()}' to '{new_color.name()}'")
 
     def redo(self):
-        if self.color_type == 'even':
-            self.model.setEvenRowColor(self.new_color)
-        elif self.color_type == 'odd':
-            self.model.setOddRowColor(self.new_color)
+        with self.model.batch():
+            if self.color_type == 'even':
+                self.model.setEvenRowColor(self.new_color)
+            elif self.color_type == 'odd':
+                self.model.setOddRowColor(self.new_color)
 
     def undo(self):
-        if self.color_type == 'even':
-            self.model.setEvenRowColor(self.old_color)
-        elif self.color_type == 'odd':
-            self.model.setOddRowColor(self.old_color)
+        with self.model.batch():
+            if self.color_type == 'even':
+                self.model.setEvenRowColor(self.old_color)
+            elif self.color_type == 'odd':
+                self.model.setOddRowColor(self.old_color)
 
 
 class SetBackgroundColorCommand(QUndoCommand):
@@ -127,6 +182,36 @@ class ColorButton(QWidget):
         self.button.setStyleSheet(f'background-color: {self.color.name()};')
 
 
+class BrowseEdit(QWidget):
+    def __init__(self, browse, parent=None):
+        super().__init__(parent)
+        self.browse = browse
+        self.line_edit = QLineEdit()
+        self.button = QToolButton()
+        self.button.setText("…")
+        self.button.clicked.connect(self.openBrowser)
+        layout = QHBoxLayout()
+        layout.addWidget(self.line_edit)
+        layout.addWidget(self.button)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.setLayout(layout)
+        self.setAutoFillBackground(True)
+        # The view focuses the editor itself; typing has to reach the line edit
+        self.setFocusProxy(self.line_edit)
+
+    def openBrowser(self):
+        # The dialog is only built when the user asks for it, not when the cell starts editing
+        text = self.browse(self, self.text())
+        if text:
+            self.setText(text)
+
+    def text(self):
+        return self.line_edit.text()
+
+    def setText(self, text):
+        self.line_edit.setText(text)
+
+
 class ColorDelegate(QStyledItemDelegate):
     def createEditor(self, parent, option, index):
         editor = ColorButton(parent)
@@ -141,8 +226,6 @@ class ColorDelegate(QStyledItemDelegate):
         color = editor.getColor().name()
         if model.data(index, Qt.EditRole) != color:
             model.setData(index, color, Qt.EditRole)
-            # Trigger the background color change for the rows
-            model.dataChanged.emit(index, index, [Qt.BackgroundRole])
 
     def commitAndCloseEditor(self, color):
         editor = self.sender()
@@ -150,16 +233,34 @@ class ColorDelegate(QStyledItemDelegate):
         self.closeEditor.emit(editor)
 
 
-# StringDelegate
-class StringDelegate(QStyledItemDelegate):
+# SimpleDelegate (editor built by a factory, value moved in/out by two callables)
+class SimpleDelegate(QStyledItemDelegate):
+    def __init__(self, editor_factory, load, save, parent=None):
+        super().__init__(parent)
+        self.editor_factory = editor_factory
+        self.load = load
+        self.save = save
+
     def createEditor(self, parent, option, index):
-        return QLineEdit(parent)
+        return self.editor_factory(parent)
 
     def setEditorData(self, editor, index):
-        editor.setText(index.model().data(index, Qt.EditRole))
+        self.load(editor, index.model().data(index, Qt.EditRole))
 
     def setModelData(self, editor, model, index):
-        model.setData(index, editor.text(), Qt.EditRole)
+        model.setData(index, self.save(editor), Qt.EditRole)
+
+
+def _int_editor(parent):
+    editor = QSpinBox(parent)
+    editor.setRange(-2147483648, 2147483647)
+    return editor
+
+
+def _float_editor(parent):
+    editor = QDoubleSpinBox(parent)
+    editor.setRange(-1.79769e+308, 1.79769e+308)
+    return editor
 
 
 # StringListDelegate (list of strings)
@@ -182,138 +283,74 @@ class StringListDelegate(QStyledItemDelegate):
         editor.setGeometry(option.rect)
 
 
-# BoolDelegate
-class BoolDelegate(QStyledItemDelegate):
-    def createEditor(self, parent, option, index):
-        return QCheckBox(parent)
-
-    def setEditorData(self, editor, index):
-        editor.setChecked(index.model().data(index, Qt.EditRole))
-
-    def setModelData(self, editor, model, index):
-        model.setData(index, editor.isChecked(), Qt.EditRole)
-
-
-# IntDelegate
-class IntDelegate(QStyledItemDelegate):
-    def createEditor(self, parent, option, index):
-        editor = QSpinBox(parent)
-        editor.setRange(-2147483648, 2147483647)
-        return editor
-
-    def setEditorData(self, editor, index):
-        editor.setValue(int(index.model().data(index, Qt.EditRole)))
-
-    def setModelData(self, editor, model, index):
-        model.setData(index, editor.value(), Qt.EditRole)
-
-
-# FloatDelegate
-class FloatDelegate(QStyledItemDelegate):
-    def createEditor(self, parent, option, index):
-        editor = QDoubleSpinBox(parent)
-        editor.setRange(-1.79769e+308, 1.79769e+308)
-        return editor
-
-    def setEditorData(self, editor, index):
-        editor.setValue(float(index.model().data(index, Qt.EditRole)))
-
-    def setModelData(self, editor, model, index):
-        model.setData(index, editor.value(), Qt.EditRole)
-
-
-# DateDelegate
-class DateDelegate(QStyledItemDelegate):
-    def createEditor(self, parent, option, index):
-        return QDateEdit(parent)
-
-    def setEditorData(self, editor, index):
-        editor.setDate(index.model().data(index, Qt.EditRole))
-
-    def setModelData(self, editor, model, index):
-        model.setData(index, editor.date(), Qt.EditRole)
-
-
-# DateTimeDelegate
-class DateTimeDelegate(QStyledItemDelegate):
-    def createEditor(self, parent, option, index):
-        return QDateTimeEdit(parent)
-
-    def setEditorData(self, editor, index):
-        editor.setDateTime(index.model().data(index, Qt.EditRole))
-
-    def setModelData(self, editor, model, index):
-        model.setData(index, editor.dateTime(), Qt.EditRole)
-
+# FileDelegate
+class FileDelegate(QStyledItemDelegate):
+    caption = "Select File"
+    file_filter = ""
 
-# TimeDelegate
-class TimeDelegate(QStyledItemDelegate):
     def createEditor(self, parent, option, index):
-        return QTimeEdit(parent)
+        return BrowseEdit(self.browse, parent)
 
     def setEditorData(self, editor, index):
-        editor.setTime(index.model().data(index, Qt.EditRole))
+        editor.setText(index.model().data(index, Qt.EditRole))
 
     def setModelData(self, editor, model, index):
-        model.setData(index, editor.time(), Qt.EditRole)
-
-
-# FileDelegate
-class FileDelegate(QStyledItemDelegate):
-    def createEditor(self, parent, option, index):
-        return QFileDialog(parent)
+        model.setData(index, editor.text(), Qt.EditRole)
 
-    def setEditorData(self, editor, index):
-        editor.selectFile(index.model().data(index, Qt.EditRole))
+    def updateEditorGeometry(self, editor, option, index):
+        editor.setGeometry(option.rect)
 
-    def setModelData(self, editor, model, index):
-        model.setData(index, editor.selectedFiles()[0], Qt.EditRole)
+    def browse(self, parent, current):
+        file_path, _ = QFileDialog.getOpenFileName(parent, self.caption, current, self.file_filter)
+        return file_path
 
 
 # FontDelegate
 class FontDelegate(QStyledItemDelegate):
     def createEditor(self, parent, option, index):
-        return QFontDialog(parent)
+        return BrowseEdit(self.browse, parent)
 
     def setEditorData(self, editor, index):
-        editor.setCurrentFont(QFont(index.model().data(index, Qt.EditRole)))
+        editor.setText(index.model().data(index, Qt.EditRole))
 
     def setModelData(self, editor, model, index):
-        model.setData(index, editor.currentFont().toString(), Qt.EditRole)
+        model.setData(index, editor.text(), Qt.EditRole)
 
+    def updateEditorGeometry(self, editor, option, index):
+        editor.setGeometry(option.rect)
 
-# IconDelegate
-class IconDelegate(QStyledItemDelegate):
-    def createEditor(self, parent, option, index):
-        return QFileDialog(parent)
+    def browse(self, parent, current):
+        font = QFont()
+        font.fromString(current)
+        ok, font = QFontDialog.getFont(font, parent)
+        return font.toString() if ok else None
 
-    def setEditorData(self, editor, index):
-        editor.selectFile(index.model().data(index, Qt.EditRole))
 
-    def setModelData(self, editor, model, index):
-        model.setData(index, editor.selectedFiles()[0], Qt.EditRole)
+# IconDelegate
+class IconDelegate(FileDelegate):
+    caption = "Select Icon"
+    file_filter = "Images (*.png *.jpg *.jpeg *.bmp *.svg *.ico)"
 
 
 # CursorDelegate
 class CursorDelegate(QStyledItemDelegate):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.cursor_map = {
-            "ArrowCursor": Qt.ArrowCursor,
-            "WaitCursor": Qt.WaitCursor,
-            "IBeamCursor": Qt.IBeamCursor,
-            "CrossCursor": Qt.CrossCursor,
-            "SizeVerCursor": Qt.SizeVerCursor,
-            "SizeHorCursor": Qt.SizeHorCursor,
-            "SizeBDiagCursor": Qt.SizeBDiagCursor,
-            "SizeFDiagCursor": Qt.SizeFDiagCursor,
-            "SizeAllCursor": Qt.SizeAllCursor,
-            "BlankCursor": Qt.BlankCursor
-        }
+    CURSOR_NAMES = (
+        "ArrowCursor",
+        "WaitCursor",
+        "IBeamCursor",
+        "CrossCursor",
+        "SizeVerCursor",
+        "SizeHorCursor",
+        "SizeBDiagCursor",
+        "SizeFDiagCursor",
+        "SizeAllCursor",
+        "BlankCursor"
+    )
+    CURSOR_MAP = {name: getattr(Qt, name) for name in CURSOR_NAMES}
 
     def createEditor(self, parent, option, index):
         editor = QComboBox(parent)
-        editor.addItems(self.cursor_map.keys())
+        editor.addItems(self.CURSOR_NAMES)
         return editor
 
     def setEditorData(self, editor, index):
@@ -325,41 +362,8 @@ class CursorDelegate(QStyledItemDelegate):
         model.setData(index, cursor_name)
 
 
-# UrlDelegate
-class UrlDelegate(QStyledItemDelegate):
-    def createEditor(self, parent, option, index):
-        return QLineEdit(parent)
-
-    def setEditorData(self, editor, index):
-        editor.setText(index.model().data(index, Qt.EditRole))
-
-    def setModelData(self, editor, model, index):
-        model.setData(index, editor.text(), Qt.EditRole)
-
-
-# KeySequenceDelegate
-class KeySequenceDelegate(QStyledItemDelegate):
-    def createEditor(self, parent, option, index):
-        return QKeySequenceEdit(parent)
-
-    def setEditorData(self, editor, index):
-        editor.setKeySequence(QKeySequence(index.model().data(index, Qt.EditRole)))
-
-    def setModelData(self, editor, model, index):
-        model.setData(index, editor.keySequence().toString(), Qt.EditRole)
-
-
-# PaletteDelegate
-class PaletteDelegate(QStyledItemDelegate):
-    def createEditor(self, parent, option, index):
-        return QColorDialog(parent)
-
-    def setEditorData(self, editor, index):
-        editor.setCurrentColor(QColor(index.model().data(index, Qt.EditRole)))
-
-    def setModelData(self, editor, model, index):
-        model.setData(index, editor.currentColor().name(), Qt.EditRole)
-
+# PaletteDelegate (edited like a color, through a ColorButton)
+class PaletteDelegate(ColorDelegate):
     def updateEditorGeometry(self, editor, option, index):
         editor.setGeometry(option.rect)
 
@@ -404,7 +408,7 @@ class PixmapDelegate(QStyledItemDelegate):
     def setEditorData(self, editor, index):
         value = index.model().data(index, Qt.EditRole)
         if isinstance(value, dict) and 'pixmap' in value and 'path' in value:
-            pixmap = QPixmap(value['path'])
+            pixmap = value['pixmap']
             editor.label.setPixmap(pixmap.scaled(editor.label.size(), Qt.KeepAspectRatio))
             editor.selected_pixmap = pixmap
             editor.file_path = value['path']
@@ -412,6 +416,7 @@ class PixmapDelegate(QStyledItemDelegate):
 
     def setModelData(self, editor, model, index):
         if hasattr(editor, 'selected_pixmap') and hasattr(editor, 'file_path'):
+            # Build a fresh dict so the model's cached thumbnail is not reused for a new image
             model.setData(index, {'pixmap': editor.selected_pixmap, 'path': editor.file_path}, Qt.EditRole)
 
 
@@ -429,221 +434,216 @@ class PixmapDelegate(QStyledItemDelegate):
             editor.button.setText("Change Image")
 
 
-# Vec2Delegate
-class Vec2Delegate(QStyledItemDelegate):
-    def createEditor(self, parent, option, index):
-        editor = QWidget(parent)
-        layout = QHBoxLayout(editor)
-        layout.setContentsMargins(0, 0, 0, 0)
-        editor.xEdit = QSpinBox()
-        editor.yEdit = QSpinBox()
-        layout.addWidget(editor.xEdit)
-        layout.addWidget(editor.yEdit)
-        return editor
-
-    def setEditorData(self, editor, index):
-        value = index.model().data(index, Qt.EditRole)
-        x, y = map(int, value.split(","))
-        editor.xEdit.setValue(x)
-        editor.yEdit.setValue(y)
-
-    def setModelData(self, editor, model, index):
-        value = f"{editor.xEdit.value()},{editor.yEdit.value()}"
-        model.setData(index, value, Qt.EditRole)
-
-    def updateEditorGeometry(self, editor, option, index):
-        editor.setGeometry(option.rect)
-
-
-# Vec2fDelegate
-class Vec2fDelegate(QStyledItemDelegate):
-    def createEditor(self, parent, option, index):
-        editor = QWidget(parent)
-        layout = QHBoxLayout(editor)
-        layout.setContentsMargins(0, 0, 0, 0)
-        editor.xEdit = QDoubleSpinBox()
-        editor.yEdit = QDoubleSpinBox()
-        layout.addWidget(editor.xEdit)
-        layout.addWidget(editor.yEdit)
-        return editor
-
-    def setEditorData(self, editor, index):
-        value = index.model().data(index, Qt.EditRole)
-        x, y = map(float, value.split(","))
-        editor.xEdit.setValue(x)
-        editor.yEdit.setValue(y)
-
-    def setModelData(self, editor, model, index):
-        value = f"{editor.xEdit.value()},{editor.yEdit.value()}"
-        model.setData(index, value, Qt.EditRole)
-
-    def updateEditorGeometry(self, editor, option, index):
-        editor.setGeometry(option.rect)
-
+# VecDelegate (tuple of 2-4 int or float components; comma-separated strings are still accepted)
+class VecDelegate(QStyledItemDelegate):
+    def __init__(self, size, is_float=False, parent=None):
+        super().__init__(parent)
+        self.size = size
+        self.spin_box_class = QDoubleSpinBox if is_float else QSpinBox
+        self.convert = float if is_float else int
+        # Closed editors are kept for reuse instead of being rebuilt on every edit
+        self._pool = []
 
-# Vec3Delegate
-class Vec3Delegate(QStyledItemDelegate):
     def createEditor(self, parent, option, index):
+        if self._pool:
+            editor = self._pool.pop()
+            editor.setParent(parent)
+            return editor
+        return self._build(parent)
+
+    def destroyEditor(self, editor, index):
+        # The view may destroy the same editor twice (e.g. closePersistentEditor while editing)
+        if editor in self._pool:
+            return
+        if len(self._pool) >= _EDITOR_POOL_SIZE:
+            super().destroyEditor(editor, index)
+            return
+        editor.hide()
+        editor.setParent(None)
+        self._pool.append(editor)
+
+    def _build(self, parent):
         editor = QWidget(parent)
         layout = QHBoxLayout(editor)
         layout.setContentsMargins(0, 0, 0, 0)
-        editor.xEdit = QDoubleSpinBox()
-        editor.yEdit = QDoubleSpinBox()
-        editor.zEdit = QDoubleSpinBox()
-        layout.addWidget(editor.xEdit)
-        layout.addWidget(editor.yEdit)
-        layout.addWidget(editor.zEdit)
+        editor.edits = []
+        for _ in range(self.size):
+            spin_box = self.spin_box_class()
+            layout.addWidget(spin_box)
+            editor.edits.append(spin_box)
         return editor
 
     def setEditorData(self, editor, index):
         value = index.model().data(index, Qt.EditRole)
-        x, y, z = map(int, value.split(","))
-        editor.xEdit.setValue(x)
-        editor.yEdit.setValue(y)
-        editor.zEdit.setValue(z)
+        if isinstance(value, str):
+            value = map(self.convert, value.split(","))
+        for spin_box, component in zip(editor.edits, value):
+            spin_box.setValue(component)
 
     def setModelData(self, editor, model, index):
-        value = f"{editor.xEdit.value()},{editor.yEdit.value()},{editor.zEdit.value()}"
+        value = tuple(spin_box.value() for spin_box in editor.edits)
         model.setData(index, value, Qt.EditRole)
 
     def updateEditorGeometry(self, editor, option, index):
         editor.setGeometry(option.rect)
 
 
-# Vec3fDelegate
-class Vec3fDelegate(QStyledItemDelegate):
-    def createEditor(self, parent, option, index):
-        editor = QWidget(parent)
-        layout = QHBoxLayout(editor)
-        layout.setContentsMargins(0, 0, 0, 0)
-        editor.xEdit = QDoubleSpinBox()
-        editor.yEdit = QDoubleSpinBox()
-        editor.zEdit = QDoubleSpinBox()
-        layout.addWidget(editor.xEdit)
-        layout.addWidget(editor.yEdit)
-        layout.addWidget(editor.zEdit)
-        return editor
-
-    def setEditorData(self, editor, index):
-        value = index.model().data(index, Qt.EditRole)
-        x, y, z = map(float, value.split(","))
-        editor.xEdit.setValue(x)
-        editor.yEdit.setValue(y)
-        editor.zEdit.setValue(z)
-
-    def setModelData(self, editor, model, index):
-        value = f"{editor.xEdit.value()},{editor.yEdit.value()},{editor.zEdit.value()}"
-        model.setData(index, value, Qt.EditRole)
-
-    def updateEditorGeometry(self, editor, option, index):
-        editor.setGeometry(option.rect)
-
+# PropertyDelegate (dispatches to the delegate for the property type)
+class PropertyDelegate(QStyledItemDelegate):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Typed delegates are only built the first time a property of that type is edited
+        self._delegate_factories = {
+            "string": partial(SimpleDelegate, QLineEdit, QLineEdit.setText, QLineEdit.text),
+            "color": ColorDelegate,
+            "bool": partial(SimpleDelegate, QCheckBox, QCheckBox.setChecked, QCheckBox.isChecked),
+            "int": partial(SimpleDelegate, _int_editor, lambda e, v: e.setValue(int(v)), QSpinBox.value),
+            "float": partial(SimpleDelegate, _float_editor, lambda e, v: e.setValue(float(v)), QDoubleSpinBox.value),
+            "date": partial(SimpleDelegate, QDateEdit, QDateEdit.setDate, QDateEdit.date),
+            "datetime": partial(SimpleDelegate, QDateTimeEdit, QDateTimeEdit.setDateTime, QDateTimeEdit.dateTime),
+            "time": partial(SimpleDelegate, QTimeEdit, QTimeEdit.setTime, QTimeEdit.time),
+            "file": FileDelegate,
+            "font": FontDelegate,
+            "icon": IconDelegate,
+            "cursor": CursorDelegate,
+            "url": partial(SimpleDelegate, QLineEdit, QLineEdit.setText, QLineEdit.text),
+            "keysequence": partial(SimpleDelegate, QKeySequenceEdit,
+                                   lambda e, v: e.setKeySequence(QKeySequence(v)),
+                                   lambda e: e.keySequence().toString()),
+            "palette": PaletteDelegate,
+            "ByteArray": ByteArrayDelegate,
+            "Pixmap": PixmapDelegate,
+            "Stringlist": StringListDelegate,
+            "vec2": partial(VecDelegate, 2, False),
+            "vec2f": partial(VecDelegate, 2, True),
+            "vec3": partial(VecDelegate, 3, False),
+            "vec3f": partial(VecDelegate, 3, True),
+            "vec4": partial(VecDelegate, 4, False),
+            "vec4f": partial(VecDelegate, 4, True)
+        }
+        self._delegate_cache = {}
+
+    def _get_delegate(self, type_name):
+        delegate = self._delegate_cache.get(type_name)
+        if delegate is None:
+            factory = self._delegate_factories.get(type_name)
+            if factory is None:
+                # Unknown types share the string delegate
+                delegate = self._get_delegate("string")
+            else:
+                delegate = factory(self)
+                # Editors that commit themselves (e.g. ColorButton) signal through the inner delegate
+                delegate.commitData.connect(self.commitData)
+                delegate.closeEditor.connect(self.closeEditor)
+            self._delegate_cache[type_name] = delegate
+        return delegate
+
+    def delegateForIndex(self, index):
+        model = index.model()
+        if isinstance(model, QAbstractProxyModel):
+            index = model.mapToSource(index)
+            model = index.model()
+        return self._get_delegate(model.getPropertyType(index))
 
-# Vec4Delegate
-class Vec4Delegate(QStyledItemDelegate):
     def createEditor(self, parent, option, index):
-        editor = QWidget(parent)
-        layout = QHBoxLayout(editor)
-        layout.setContentsMargins(0, 0, 0, 0)
-        editor.xEdit = QDoubleSpinBox()
-        editor.yEdit = QDoubleSpinBox()
-        editor.zEdit = QDoubleSpinBox()
-        editor.wEdit = QDoubleSpinBox()
-        layout.addWidget(editor.xEdit)
-        layout.addWidget(editor.yEdit)
-        layout.addWidget(editor.zEdit)
-        layout.addWidget(editor.wEdit)
-        return editor
+        return self.delegateForIndex(index).createEditor(parent, option, index)
 
     def setEditorData(self, editor, index):
-        value = index.model().data(index, Qt.EditRole)
-        x, y, z, w = map(int, value.split(","))
-        editor.xEdit.setValue(x)
-        editor.yEdit.setValue(y)
-        editor.zEdit.setValue(z)
-        editor.wEdit.setValue(w)
+        self.delegateForIndex(index).setEditorData(editor, index)
 
     def setModelData(self, editor, model, index):
-        value = f"{editor.xEdit.value()},{editor.yEdit.value()},{editor.zEdit.value()},{editor.wEdit.value()}"
-        model.setData(index, value, Qt.EditRole)
+        self.delegateForIndex(index).setModelData(editor, model, index)
 
     def updateEditorGeometry(self, editor, option, index):
-        editor.setGeometry(option.rect)
+        self.delegateForIndex(index).updateEditorGeometry(editor, option, index)
 
+    def destroyEditor(self, editor, index):
+        # The index may already be gone (e.g. after a model reset); then just delete the editor
+        if not index.isValid():
+            super().destroyEditor(editor, index)
+            return
+        self.delegateForIndex(index).destroyEditor(editor, index)
 
-# Vec4fDelegate
-class Vec4fDelegate(QStyledItemDelegate):
-    def createEditor(self, parent, option, index):
-        editor = QWidget(parent)
-        layout = QHBoxLayout(editor)
-        layout.setContentsMargins(0, 0, 0, 0)
-        editor.xEdit = QDoubleSpinBox()
-        editor.yEdit = QDoubleSpinBox()
-        editor.zEdit = QDoubleSpinBox()
-        editor.wEdit = QDoubleSpinBox()
-        layout.addWidget(editor.xEdit)
-        layout.addWidget(editor.yEdit)
-        layout.addWidget(editor.zEdit)
-        layout.addWidget(editor.wEdit)
-        return editor
 
-    def setEditorData(self, editor, index):
-        value = index.model().data(index, Qt.EditRole)
-        x, y, z, w = map(float, value.split(","))
-        editor.xEdit.setValue(x)
-        editor.yEdit.setValue(y)
-        editor.zEdit.setValue(z)
-        editor.wEdit.setValue(w)
+# Cheap change checks for value types whose == is costly (pixmaps compare by path)
+_KEY_BY_TYPE = {
+    QColor: QColor.rgba,
+    QDate: QDate.toJulianDay,
+    QDateTime: QDateTime.toMSecsSinceEpoch,
+    QTime: QTime.msecsSinceStartOfDay,
+}
 
-    def setModelData(self, editor, model, index):
-        value = f"{editor.xEdit.value()},{editor.yEdit.value()},{editor.zEdit.value()},{editor.wEdit.value()}"
-        model.setData(index, value, Qt.EditRole)
 
-    def updateEditorGeometry(self, editor, option, index):
-        editor.setGeometry(option.rect)
+def _values_differ(old_value, new_value):
+    value_type = type(old_value)
+    if value_type is not type(new_value):
+        return True
+    if value_type is dict:
+        return old_value.get('path') != new_value.get('path')
+    key = _KEY_BY_TYPE.get(value_type)
+    if key is not None:
+        return key(old_value) != key(new_value)
+    return old_value != new_value
 
 
 # PropertyModel
 class PropertyModel(QAbstractItemModel):
-    afterDataChanged = Signal(object, object, object)
+    afterDataChanged = Signal(QModelIndex, object, object)
 
     def __init__(self, properties=None, parent=None):
         super().__init__(parent)
         self.properties = properties or []
+        self._type_by_row = [p.type for p in self.properties]
+        self._row_count = len(self.properties)
         self.headers = ["Property", "Value"]
         self.is_undo_redo = False
-        self.even_row_color = QColor("#000000")
-        self.odd_row_color = QColor("#000000")
+        # Nesting depth of batch() and the pending [first_row, last_row, first_column, last_column, roles]
+        self._silenced = 0
+        self._buffer = None
+        # Row colors are never mutated in place, so the defaults can be shared
+        self.even_row_color = _DEFAULT_EVEN
+        self.odd_row_color = _DEFAULT_ODD
 
-    def rowCount(self, parent=QModelIndex()):
-        if not parent.isValid():
-            return len(self.properties)
-        return 0
+    def rowCount(self, parent=_ROOT):
+        return 0 if parent.isValid() else self._row_count
 
-    def columnCount(self, parent=QModelIndex()):
-        return 2
+    def columnCount(self, parent=_ROOT):
+        return _COLUMN_COUNT
 
     def data(self, index, role=Qt.DisplayRole):
-        if not index.isValid():
+        role = int(role)
+        if role not in _DATA_ROLES:
             return None
-
-        property_item = self._get_property_item(index)
-
-        if role == Qt.DisplayRole or role == Qt.EditRole:
-            if index.column() == 0:
+        row = index.row()
+        if row < 0:
+            return None
+        col = index.column()
+
+        if role == _BG:
+            # Row striping only needs the row parity, not the property item
+            if col == 1 and self._type_by_row[row] == 'color':
+                return self.properties[row].color()
+            return self.even_row_color if (row & 1) == 0 else self.odd_row_color
+        elif role == _DISPLAY or role == _EDIT:
+            property_item = self.properties[row]
+            if col == 0:
                 return property_item.name
-            elif index.column() == 1:
-                if isinstance(property_item.value, dict) and 'path' in property_item.value:
-                    return property_item.value['path']
-                return property_item.value
-        elif role == Qt.DecorationRole and index.column() == 1:
-            if isinstance(property_item.value, dict) and 'pixmap' in property_item.value:
-                return property_item.value['pixmap'].scaled(50, 50, Qt.KeepAspectRatio)
-
-        elif role == Qt.BackgroundRole:
-            if index.column() == 1 and property_item.type == 'color':
-                return QColor(property_item.value)
-            return self.even_row_color if index.row() % 2 == 0 else self.odd_row_color
+            value = property_item.value
+            if isinstance(value, dict) and 'path' in value:
+                return value['path']
+            # Sequences may come back from a proxy as lists rather than tuples
+            if role == _DISPLAY and isinstance(value, (tuple, list)):
+                return property_item.displayText()
+            return value
+        elif role == _DECORATION and col == 1:
+            value = self.properties[row].value
+            if isinstance(value, dict) and 'pixmap' in value:
+                # The thumbnail is scaled once and kept with the value; a new image means a new dict
+                scaled = value.get('scaled')
+                if scaled is None:
+                    scaled = value['scaled'] = value['pixmap'].scaled(50, 50, Qt.KeepAspectRatio,
+                                                                      Qt.SmoothTransformation)
+                return scaled
 
         return None
 
@@ -652,13 +652,13 @@ class PropertyModel(QAbstractItemModel):
             return self.headers[section]
         return None
 
-    def index(self, row, column, parent=QModelIndex()):
+    def index(self, row, column, parent=_ROOT):
         if not self.hasIndex(row, column, parent):
             return QModelIndex()
         return self.createIndex(row, column)
 
     def parent(self, index):
-        return QModelIndex()
+        return _ROOT
 
     def setData(self, index, value, role=Qt.EditRole):
         if index.isValid() and role == Qt.EditRole:
@@ -666,9 +666,9 @@ class PropertyModel(QAbstractItemModel):
 
             if index.column() == 1:
                 old_value = property_item.value
-                if old_value != value:
+                if _values_differ(old_value, value):
                     property_item.value = value
-                    self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole, Qt.DecorationRole,Qt.BackgroundRole])
+                    self.notify(index, index, [Qt.DisplayRole, Qt.EditRole, Qt.DecorationRole, Qt.BackgroundRole])
                     if not self.is_undo_redo:
                         self.afterDataChanged.emit(index, old_value, value)
                     return True
@@ -682,50 +682,301 @@ class PropertyModel(QAbstractItemModel):
         return Qt.ItemIsEnabled | Qt.ItemIsSelectable
 
     def _get_property_item(self, index):
-        return self.properties[index.row()]
+        properties = self.properties
+        row = index.row()
+        return properties[row]
+
+    def setProperties(self, items):
+        # Replace all properties with one reset; self.properties must only change through
+        # setProperties/insertProperty/removeProperty so the cached counts stay in sync
+        self.beginResetModel()
+        self.properties = list(items)
+        self._type_by_row = [p.type for p in self.properties]
+        self._row_count = len(self.properties)
+        self.endResetModel()
+
+    def insertProperty(self, row, item):
+        self.beginInsertRows(_ROOT, row, row)
+        self.properties.insert(row, item)
+        self._type_by_row.insert(row, item.type)
+        self._row_count += 1
+        self.endInsertRows()
+
+    def removeProperty(self, row):
+        self.beginRemoveRows(_ROOT, row, row)
+        del self.properties[row]
+        del self._type_by_row[row]
+        self._row_count -= 1
+        self.endRemoveRows()
 
     def getPropertyType(self, index):
-        if not index.isValid():
-            return None
-
-        property_item = self._get_property_item(index)
-        return property_item.type
+        row = index.row()
+        if 0 <= row < self._row_count:
+            return self._type_by_row[row]
+        return None
 
     @contextmanager
     def undo_redo_context(self):
+        # While set, setData does not emit afterDataChanged, so replays never push new commands
+        previous = self.is_undo_redo
         self.is_undo_redo = True
         try:
             yield
         finally:
-            self.is_undo_redo = False
+            self.is_undo_redo = previous
+
+    @contextmanager
+    def batch(self):
+        # Buffer notify() calls and emit one dataChanged covering all of them on the outermost exit
+        self._silenced += 1
+        try:
+            yield
+        finally:
+            self._silenced -= 1
+            if not self._silenced and self._buffer is not None:
+                first_row, last_row, first_column, last_column, roles = self._buffer
+                self._buffer = None
+                self.dataChanged.emit(self.createIndex(first_row, first_column),
+                                      self.createIndex(last_row, last_column), list(roles))
+
+    def notify(self, top_left, bottom_right, roles):
+        if not self._silenced:
+            self.dataChanged.emit(top_left, bottom_right, roles)
+            return
+        buffer = self._buffer
+        if buffer is None:
+            self._buffer = [top_left.row(), bottom_right.row(), top_left.column(), bottom_right.column(), set(roles)]
+        else:
+            buffer[0] = min(buffer[0], top_left.row())
+            buffer[1] = max(buffer[1], bottom_right.row())
+            buffer[2] = min(buffer[2], top_left.column())
+            buffer[3] = max(buffer[3], bottom_right.column())
+            buffer[4].update(roles)
 
     def setEvenRowColor(self, color):
-        self.even_row_color = QColor(color)
-        self.dataChanged.emit(self.index(0, 0), self.index(self.rowCount() - 1, self.columnCount() - 1),
-                              [Qt.BackgroundRole])
+        self.even_row_color = color if isinstance(color, QColor) else QColor(color)
+        self._notifyBackgroundChanged()
 
     def setOddRowColor(self, color):
-        self.odd_row_color = QColor(color)
-        self.dataChanged.emit(self.index(0, 0), self.index(self.rowCount() - 1, self.columnCount() - 1),
-                              [Qt.BackgroundRole])
+        self.odd_row_color = color if isinstance(color, QColor) else QColor(color)
+        self._notifyBackgroundChanged()
+
+    def _notifyBackgroundChanged(self):
+        # One range over the whole model; the view clips it to what is visible
+        if self._row_count:
+            self.notify(self.createIndex(0, 0), self.createIndex(self._row_count - 1, _COLUMN_COUNT - 1),
+                        [Qt.BackgroundRole])
+
+
+def _describe_value(value):
+    # Short undo-label text; avoids stringifying pixmaps or large byte arrays
+    if isinstance(value, dict):
+        return value.get('path', '<pixmap>')
+    if isinstance(value, QByteArray):
+        return f"{value.size()} bytes"
+    return value
 
 
 class PropertyChangeCommand(QUndoCommand):
+    # Edits to the same cell closer together than this (seconds) collapse into one command
+    MERGE_INTERVAL = 0.5
+
     def __init__(self, model, index, old_value, new_value):
         super().__init__()
-        self.model = model
-        self.index = index
+        # Only the cell coordinates and the two values are kept; the model is
+        # looked up through a weak reference when the command is replayed.
+        self.model_ref = weakref.ref(model)
+        self.row = index.row()
+        self.column = index.column()
         self.old_value = old_value
         self.new_value = new_value
-        self.setText(f"Change property from '{old_value}' to '{new_value}'")
+        self.timestamp = time.monotonic()
+        # QUndoCommand.text() is not virtual, so QUndoView and the undo/redo
+        # actions only ever see the stored text; it has to be set up front.
+        self.setText(self._formatText())
+
+    def _formatText(self):
+        return f"Change property from '{_describe_value(self.old_value)}' to '{_describe_value(self.new_value)}'"
+
+    def id(self):
+        # Per-cell id, so QUndoStack only offers merges between edits of the same cell
+        return hash((self.row, self.column)) & 0x7fffffff
+
+    def mergeWith(self, other):
+        if (other.row, other.column) != (self.row, self.column):
+            return False
+        if other.timestamp - self.timestamp > self.MERGE_INTERVAL:
+            return False
+        # Last edit wins; the original old_value is kept for undo
+        self.new_value = other.new_value
+        self.timestamp = other.timestamp
+        self.setText(self._formatText())
+        # A burst that ends on the starting value is a no-op; QUndoStack drops obsolete commands
+        self.setObsolete(not _values_differ(self.old_value, self.new_value))
+        return True
 
     def redo(self):
-        with self.model.undo_redo_context():
-            self.model.setData(self.index, self.new_value, Qt.EditRole)
+        self._apply(self.new_value)
 
     def undo(self):
-        with self.model.undo_redo_context():
-            self.model.setData(self.index, self.old_value, Qt.EditRole)
+        self._apply(self.old_value)
+
+    def _apply(self, value):
+        model = self.model_ref()
+        if model is None:
+            return
+        with model.undo_redo_context():
+            model.setData(model.index(self.row, self.column), value, Qt.EditRole)
+
+
+# NameFilterProxy (flat proxy over PropertyModel keeping the rows whose name matches)
+class NameFilterProxy(QAbstractProxyModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._map = []
+        self._reverse = {}
+        self._query = ""
+        self._regex = None
+        # Proxy rows [first, last) being removed between rowsAboutToBeRemoved and rowsRemoved
+        self._pending_removal = None
+
+    def setSourceModel(self, source_model):
+        old_model = self.sourceModel()
+        self.beginResetModel()
+        if old_model is not None:
+            old_model.dataChanged.disconnect(self._on_source_data_changed)
+            old_model.modelAboutToBeReset.disconnect(self._on_source_about_to_reset)
+            old_model.modelReset.disconnect(self._on_source_reset)
+            old_model.rowsInserted.disconnect(self._on_source_rows_inserted)
+            old_model.rowsAboutToBeRemoved.disconnect(self._on_source_rows_about_to_be_removed)
+            old_model.rowsRemoved.disconnect(self._on_source_rows_removed)
+        super().setSourceModel(source_model)
+        if source_model is not None:
+            source_model.dataChanged.connect(self._on_source_data_changed)
+            source_model.modelAboutToBeReset.connect(self._on_source_about_to_reset)
+            source_model.modelReset.connect(self._on_source_reset)
+            source_model.rowsInserted.connect(self._on_source_rows_inserted)
+            source_model.rowsAboutToBeRemoved.connect(self._on_source_rows_about_to_be_removed)
+            source_model.rowsRemoved.connect(self._on_source_rows_removed)
+        self._build_map()
+        self.endResetModel()
+
+    def set_query(self, text, regex=None):
+        # Plain text is matched as a case-insensitive substring; regex is only used when given
+        self._query = text.casefold()
+        self._regex = regex
+
+        self.layoutAboutToBeChanged.emit()
+        old_indexes = self.persistentIndexList()
+        source_indexes = [self.mapToSource(index) for index in old_indexes]
+        self._build_map()
+        self.changePersistentIndexList(old_indexes, [self.mapFromSource(index) for index in source_indexes])
+        self.layoutChanged.emit()
+
+    def _build_map(self):
+        source_model = self.sourceModel()
+        if source_model is None:
+            self._map = []
+        else:
+            properties = source_model.properties
+            if self._regex is not None or self._query:
+                accepts = self._accepts
+                self._map = [row for row, item in enumerate(properties) if accepts(item)]
+            else:
+                self._map = list(range(len(properties)))
+        self._reverse = {source_row: row for row, source_row in enumerate(self._map)}
+
+    def _accepts(self, item):
+        if self._regex is not None:
+            return self._regex.match(item.name).hasMatch()
+        return self._query in item.name.casefold()
+
+    def _on_source_about_to_reset(self, *args):
+        self.beginResetModel()
+
+    def _on_source_reset(self, *args):
+        self._build_map()
+        self.endResetModel()
+
+    def _on_source_rows_inserted(self, parent, first, last):
+        count = last - first + 1
+        properties = self.sourceModel().properties
+        new_rows = [row for row in range(first, last + 1) if self._accepts(properties[row])]
+        # Existing rows keep their proxy positions; only their source rows shift
+        position = bisect_left(self._map, first)
+        self._map[position:] = [source_row + count for source_row in self._map[position:]]
+        if new_rows:
+            self.beginInsertRows(_ROOT, position, position + len(new_rows) - 1)
+            self._map[position:position] = new_rows
+        self._reverse = {source_row: row for row, source_row in enumerate(self._map)}
+        if new_rows:
+            self.endInsertRows()
+
+    def _on_source_rows_about_to_be_removed(self, parent, first, last):
+        start = bisect_left(self._map, first)
+        end = bisect_right(self._map, last)
+        self._pending_removal = (start, end)
+        if end > start:
+            self.beginRemoveRows(_ROOT, start, end - 1)
+
+    def _on_source_rows_removed(self, parent, first, last):
+        count = last - first + 1
+        start, end = self._pending_removal
+        self._pending_removal = None
+        self._map[start:] = [source_row - count for source_row in self._map[end:]]
+        self._reverse = {source_row: row for row, source_row in enumerate(self._map)}
+        if end > start:
+            self.endRemoveRows()
+
+    def _on_source_data_changed(self, top_left, bottom_right, roles):
+        reverse = self._reverse
+        rows = [reverse[source_row] for source_row in range(top_left.row(), bottom_right.row() + 1)
+                if source_row in reverse]
+        if rows:
+            self.dataChanged.emit(self.createIndex(min(rows), top_left.column()),
+                                  self.createIndex(max(rows), bottom_right.column()), roles)
+
+    def rowCount(self, parent=_ROOT):
+        return 0 if parent.isValid() else len(self._map)
+
+    def columnCount(self, parent=_ROOT):
+        source_model = self.sourceModel()
+        if source_model is None or parent.isValid():
+            return 0
+        return source_model.columnCount()
+
+    def index(self, row, column, parent=_ROOT):
+        if parent.isValid() or not 0 <= row < len(self._map) or not 0 <= column < self.columnCount():
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index):
+        return _ROOT
+
+    def hasChildren(self, parent=_ROOT):
+        return not parent.isValid() and bool(self._map)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        source_model = self.sourceModel()
+        if source_model is None:
+            return None
+        return source_model.headerData(section, orientation, role)
+
+    def mapToSource(self, proxy_index):
+        source_model = self.sourceModel()
+        # Indexes from another model (e.g. an editor committed during a model swap) do not map
+        if (source_model is None or not proxy_index.isValid() or proxy_index.model() is not self
+                or not 0 <= proxy_index.row() < len(self._map)):
+            return QModelIndex()
+        return source_model.index(self._map[proxy_index.row()], proxy_index.column())
+
+    def mapFromSource(self, source_index):
+        if not source_index.isValid() or source_index.model() is not self.sourceModel():
+            return QModelIndex()
+        row = self._reverse.get(source_index.row())
+        if row is None:
+            return QModelIndex()
+        return self.createIndex(row, source_index.column())
 
 
 class PropertyEditor(QTreeView):
@@ -733,50 +984,34 @@ class PropertyEditor(QTreeView):
 
     def __init__(self, properties=None, parent=None):
         super().__init__(parent)
-        self.delegates = {
-            "string": StringDelegate(),
-            "color": ColorDelegate(),
-            "bool": BoolDelegate(),
-            "int": IntDelegate(),
-            "float": FloatDelegate(),
-            "date": DateDelegate(),
-            "datetime": DateTimeDelegate(),
-            "time": TimeDelegate(),
-            "file": FileDelegate(),
-            "font": FontDelegate(),
-            "icon": IconDelegate(),
-            "cursor": CursorDelegate(),
-            "url": UrlDelegate(),
-            "keysequence": KeySequenceDelegate(),
-            "palette": PaletteDelegate(),
-            "ByteArray": ByteArrayDelegate(),
-            "Pixmap": PixmapDelegate(),
-            "Stringlist": StringListDelegate(),
-            "vec2": Vec2Delegate(),
-            "vec2f": Vec2fDelegate(),
-            "vec3": Vec3Delegate(),
-            "vec3f": Vec3fDelegate(),
-            "vec4": Vec4Delegate(),
-            "vec4f": Vec4fDelegate()
-        }
-
         self._model = PropertyModel(properties)
-        self.proxy_model = QSortFilterProxyModel(self)
-        self.proxy_model.setSourceModel(self._model)
-        self.setModel(self.proxy_model)
+        # The proxy is only attached while a filter is active; otherwise the
+        # view shows the source model directly and edits skip proxy filtering.
+        self.proxy_model = NameFilterProxy(self)
+        self.setModel(self._model)
+        self.setItemDelegateForColumn(1, PropertyDelegate(self))
+
+        # Compiled filter patterns, so retyping a pattern does not re-optimize it
+        self._regex_cache = {}
+        self._filter_pattern = None
 
         # Connect dataChanged signal
         self._model.dataChanged.connect(self.on_data_changed)
 
+    @Slot(QModelIndex, QModelIndex, list)
     def on_data_changed(self, top_left, bottom_right, roles):
-        for row in range(top_left.row(), bottom_right.row() + 1):
-            index = self._model.index(row, 1)
-            property_name = self._model.data(self._model.index(row, 0))
-            if property_name == "Cursor":
-                cursor_name = self._model.data(index)
-                self.delegateChanged.emit(row, cursor_name)
-            # Refresh the affected rows
+        # Row-color changes cannot affect the Cursor property, so only repaint
+        if len(roles) == 1 and roles[0] == Qt.BackgroundRole:
             self.viewport().update()
+            return
+
+        properties = self._model.properties
+        for row in range(top_left.row(), bottom_right.row() + 1):
+            property_item = properties[row]
+            if property_item.name == "Cursor":
+                self.delegateChanged.emit(row, property_item.value)
+        # Refresh the affected rows
+        self.viewport().update()
 
     def get_model(self):
         return self._model
@@ -784,33 +1019,110 @@ class PropertyEditor(QTreeView):
     def setModel(self, proxy_model):
         super().setModel(proxy_model)
 
-        source_model = proxy_model.sourceModel()
-
-        for row in range(proxy_model.rowCount()):
-            proxy_index = proxy_model.index(row, 1)
-            source_index = proxy_model.mapToSource(proxy_index)
-            property_type = source_model.getPropertyType(source_index)
-            delegate = self.delegates.get(property_type, StringDelegate())
-            self.setItemDelegateForRow(row, delegate)
-            print(
-                f"Set delegate '{delegate.__class__.__name__}' for row {row} (Property: '{source_model.data(source_model.index(source_index.row(), 0))}')"
-            )
-
-    def setFilter(self, filter_pattern):
-        print("Setting filter:", filter_pattern)
-
-        filter_regex = QRegularExpression(filter_pattern)
-        self.proxy_model.setFilterRegularExpression(filter_regex)
-        self.setModel(self.proxy_model)
+    def setFilter(self, filter_pattern, use_regex=False):
+        if (filter_pattern, use_regex) == self._filter_pattern:
+            return
+        self._filter_pattern = (filter_pattern, use_regex)
+        logger.debug("Setting filter: %r", filter_pattern)
+
+        if not filter_pattern:
+            self._setFilterActive(False)
+            return
+
+        # Plain text is matched with a substring search; only real patterns go through the regex engine
+        if use_regex and not _REGEX_METACHARS.isdisjoint(filter_pattern):
+            self.proxy_model.set_query(filter_pattern, self._compiledRegex(filter_pattern))
+        else:
+            self.proxy_model.set_query(filter_pattern)
+        self._setFilterActive(True)
+
+    def _compiledRegex(self, pattern):
+        regex = self._regex_cache.get(pattern)
+        if regex is None:
+            if len(self._regex_cache) >= 64:
+                self._regex_cache.clear()
+            regex = QRegularExpression(pattern, QRegularExpression.CaseInsensitiveOption)
+            regex.optimize()
+            self._regex_cache[pattern] = regex
+        return regex
+
+    def _setFilterActive(self, active):
+        if (self.model() is self.proxy_model) == active:
+            return
+
+        current = self.currentIndex()
+        if current.isValid() and self.model() is self.proxy_model:
+            current = self.proxy_model.mapToSource(current)
+        row, column = current.row(), current.column()
+
+        # Commit an open editor while its own model is still installed; otherwise
+        # setModel() commits it through an index of the model being swapped in
+        if self.state() == QAbstractItemView.EditingState:
+            editor = self.indexWidget(self.currentIndex())
+            if editor is not None:
+                self.commitData(editor)
+                self.closeEditor(editor, QAbstractItemDelegate.NoHint)
+
+        # setModel() builds a new selection model and leaves the old one parented to the view;
+        # the header also builds one of its own, which the view's immediately replaces
+        header = self.header()
+        stale = [self.selectionModel()]
+        header_children = set(header.children())
+        if active:
+            self.proxy_model.setSourceModel(self._model)
+            self.setModel(self.proxy_model)
+        else:
+            self.setModel(self._model)
+            self.proxy_model.setSourceModel(None)
+        selection_model = self.selectionModel()
+        stale.extend(child for child in header.children()
+                     if child not in header_children and isinstance(child, QItemSelectionModel)
+                     and child is not selection_model)
+        for old_selection_model in stale:
+            old_selection_model.deleteLater()
+
+        # Keep the current property selected across the switch
+        if row >= 0:
+            current = self._model.index(row, column)
+            if active:
+                current = self.proxy_model.mapFromSource(current)
+            if current.isValid():
+                self.setCurrentIndex(current)
+
+
+@lru_cache(maxsize=None)
+def _standard_shortcuts(standard_key):
+    # Resolved on first use rather than at import: the platform key bindings need a QGuiApplication
+    return QKeySequence.keyBindings(standard_key)
+
+
+@lru_cache(maxsize=None)
+def _cursor_for_shape(shape):
+    # Standard-shape cursors never change, so one QCursor per shape is enough
+    return QCursor(shape)
 
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    # Default maximum number of commands kept on the undo stack. A burst of
+    # merged edits to one property (PropertyChangeCommand.mergeWith) takes a single slot.
+    UNDO_LIMIT = 250
+
+    def __init__(self, undo_limit=UNDO_LIMIT):
         super().__init__()
         self.undoStack = QUndoStack(self)
-
-        self.editor_widget = PropertyEditor(
-            properties=[
+        # Must be set while the stack is still empty
+        self.undoStack.setUndoLimit(undo_limit)
+        self._colorDialog = None
+        self._colorSelectedHandler = None
+        # Background color changes mutate this palette instead of copying the widget's each time
+        self._palette = self.palette()
+        self._bg_role = self.backgroundRole()
+        self._current_bg_color = self._palette.color(self._bg_role)
+
+        self.editor_widget = PropertyEditor()
+        self.model = self.editor_widget.get_model()
+        self.model.setProperties(
+            [
                 PropertyItem("Name1", "Process 1", "string"),
                 PropertyItem("Name2", "Process 2", "string"),
                 PropertyItem("Color", "#000000", "color"),
@@ -831,137 +1143,228 @@ class MainWindow(QMainWindow):
                 PropertyItem("StringList", "Type Yr list", "Stringlist"),
                 PropertyItem("ByteArray", QByteArray(b'Example'), "ByteArray"),
                 PropertyItem("Pixmap", "Select", "Pixmap"),
-                PropertyItem("Vec2D", "1 , 2", "vec2"),
-                PropertyItem("Vec2Df", "1.0,2.0", "vec2f"),
-                PropertyItem("Vec3D", "1 ,2 ,3", "vec3"),
-                PropertyItem("Vec3Df", "1.0,2.0,3.0", "vec3f"),
-                PropertyItem("Vec4D", "1 ,2 ,3 ,4", "vec4"),
-                PropertyItem("Vec4Df", "1.0,2.0,3.0,4.0", "vec4f"),
+                PropertyItem("Vec2D", (1, 2), "vec2"),
+                PropertyItem("Vec2Df", (1.0, 2.0), "vec2f"),
+                PropertyItem("Vec3D", (1, 2, 3), "vec3"),
+                PropertyItem("Vec3Df", (1.0, 2.0, 3.0), "vec3f"),
+                PropertyItem("Vec4D", (1, 2, 3, 4), "vec4"),
+                PropertyItem("Vec4Df", (1.0, 2.0, 3.0, 4.0), "vec4f"),
             ]
         )
-        self.model = self.editor_widget.get_model()
         self.editor_widget.delegateChanged.connect(self.applyCursorChange)
         self.model.afterDataChanged.connect(self.afterDataChanged)
 
         self.createActions()
         self.createMenus()
         self.createToolBars()
-        self.createUndoView()
+        self.undoDockWidget = None
 
         self.setWindowTitle("Undo Framework")
         self.setMinimumSize(874, 515)
+        # Coalesce bursts of keystrokes into a single filter update
+        self._pending_filter = ""
+        self._filter_use_regex = False
+        self._filter_timer = QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(150)
+        self._filter_timer.timeout.connect(self._apply_filter)
+
         filter_widget = QLineEdit()
         filter_widget.setPlaceholderText("Filter properties...")
         filter_widget.textChanged.connect(self.setFilter)
+        regex_check_box = QCheckBox("Regex")
+        regex_check_box.toggled.connect(self.setFilterUseRegex)
 
-        filter_layout = QVBoxLayout()
-        filter_layout.addWidget(QLabel("Filter:"), alignment=Qt.AlignTop)
-        filter_layout.addWidget(filter_widget, alignment=Qt.AlignTop)
-        filter_layout.setSpacing(0)
-        filter_layout.setContentsMargins(0, 0, 0, 0)
+        w = QWidget()
+        property_editor_layout = QVBoxLayout(w)
 
-        property_editor_layout = QVBoxLayout()
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("Filter:"))
+        filter_layout.addWidget(filter_widget)
+        filter_layout.addWidget(regex_check_box)
+        filter_layout.setContentsMargins(0, 0, 0, 0)
         property_editor_layout.addLayout(filter_layout)
         property_editor_layout.addWidget(self.editor_widget)
-        w = QWidget()
-        w.setLayout(property_editor_layout)
 
         self.setCentralWidget(w)
         self.adjustSize()
 
+    @Slot(str)
     def setFilter(self, filter_text):
-        self.editor_widget.setFilter(filter_text)
+        self._pending_filter = filter_text
+        self._filter_timer.start()
+
+    @Slot(bool)
+    def setFilterUseRegex(self, use_regex):
+        self._filter_use_regex = use_regex
+        self._filter_timer.start()
+
+    @Slot()
+    def _apply_filter(self):
+        self.editor_widget.setFilter(self._pending_filter, self._filter_use_regex)
 
+    @Slot(QModelIndex, object, object)
     def afterDataChanged(self, index, old_value, new_value):
         command = PropertyChangeCommand(self.model, index, old_value, new_value)
         self.undoStack.push(command)
 
+    @Slot(int, str)
     def applyCursorChange(self, row, cursor_name):
-        cursor_shape = CursorDelegate().cursor_map.get(cursor_name, Qt.ArrowCursor)
-        self.setCursor(QCursor(cursor_shape))
-
-    def createUndoView(self):
-        undoDockWidget = QDockWidget("Command List", self)
-        undoDockWidget.setWidget(QUndoView(self.undoStack))
-        self.addDockWidget(Qt.RightDockWidgetArea, undoDockWidget)
+        cursor_shape = CursorDelegate.CURSOR_MAP.get(cursor_name, Qt.ArrowCursor)
+        self.setCursor(_cursor_for_shape(cursor_shape))
+
+    @Slot()
+    def showUndoView(self):
+        # The dock and its QUndoView are only built the first time the command list is requested
+        if self.undoDockWidget is None:
+            self.undoView = QUndoView()
+            self.undoDockWidget = QDockWidget("Command List", self)
+            self.undoDockWidget.setWidget(self.undoView)
+            self.undoDockWidget.visibilityChanged.connect(self._onUndoViewVisibilityChanged)
+            self.addDockWidget(Qt.RightDockWidgetArea, self.undoDockWidget)
+        self.undoDockWidget.show()
+        self.undoDockWidget.raise_()
+
+    @Slot(bool)
+    def _onUndoViewVisibilityChanged(self, visible):
+        # A closed dock stops listening to the stack, so pushes don't refresh a hidden view
+        self.undoView.setStack(self.undoStack if visible else None)
 
     def createActions(self):
         self.undoAction = self.undoStack.createUndoAction(self, "&Undo")
-        self.undoAction.setShortcuts(QKeySequence.Undo)
+        self.undoAction.setShortcuts(_standard_shortcuts(QKeySequence.Undo))
 
         self.redoAction = self.undoStack.createRedoAction(self, "&Redo")
-        self.redoAction.setShortcuts(QKeySequence.Redo)
+        self.redoAction.setShortcuts(_standard_shortcuts(QKeySequence.Redo))
 
         self.exitAction = QAction("Exit", self)
-        self.exitAction.setShortcuts(QKeySequence.Quit)
+        self.exitAction.setShortcuts(_standard_shortcuts(QKeySequence.Quit))
         self.exitAction.triggered.connect(self.close)
 
-        self.aboutAction = QAction("About", self)
-        self.aboutAction.triggered.connect(self.about)
-
-        self.setEvenRowColorAction = QAction("Set Even Row Color", self)
-        self.setEvenRowColorAction.triggered.connect(self.setEvenRowColor)
-
-        self.setOddRowColorAction = QAction("Set Odd Row Color", self)
-        self.setOddRowColorAction.triggered.connect(self.setOddRowColor)
-
-        self.setBackgroundColorAction = QAction("Set Background Color", self)
-        self.setBackgroundColorAction.triggered.connect(self.setBackgroundColor)
-
     def createMenus(self):
         menuBar = QMenuBar(self)
         fileMenu = menuBar.addMenu("&File")
         fileMenu.addAction(self.exitAction)
 
         editMenu = menuBar.addMenu("&Edit")
-        editMenu.addAction(self.undoAction)
-        editMenu.addAction(self.redoAction)
+        editMenu.addActions([self.undoAction, self.redoAction])
 
-        viewMenu = menuBar.addMenu("&View")
-        viewMenu.addAction(self.setEvenRowColorAction)
-        viewMenu.addAction(self.setOddRowColorAction)
-        viewMenu.addAction(self.setBackgroundColorAction)
+        # View and Help actions are created when their menu is first opened
+        self.viewMenu = menuBar.addMenu("&View")
+        self.viewMenu.aboutToShow.connect(self._populateViewMenu)
 
-        helpMenu = menuBar.addMenu("&Help")
-        helpMenu.addAction(self.aboutAction)
+        self.helpMenu = menuBar.addMenu("&Help")
+        self.helpMenu.aboutToShow.connect(self._populateHelpMenu)
 
         self.setMenuBar(menuBar)
 
+    @Slot()
+    def _populateViewMenu(self):
+        if not self.viewMenu.isEmpty():
+            return
+        # The three color actions share one group and one handler, keyed by action data
+        self.colorGroup = QActionGroup(self)
+        self.colorGroup.setExclusive(False)
+        self.colorGroup.triggered.connect(self._onColorAction)
+
+        self.setEvenRowColorAction = QAction("Set Even Row Color", self.colorGroup)
+        self.setEvenRowColorAction.setData('even')
+
+        self.setOddRowColorAction = QAction("Set Odd Row Color", self.colorGroup)
+        self.setOddRowColorAction.setData('odd')
+
+        self.setBackgroundColorAction = QAction("Set Background Color", self.colorGroup)
+        self.setBackgroundColorAction.setData('bg')
+
+        self.showUndoViewAction = QAction("Command List", self)
+        self.showUndoViewAction.triggered.connect(self.showUndoView)
+
+        self.viewMenu.addActions(self.colorGroup.actions())
+        self.viewMenu.addSeparator()
+        self.viewMenu.addAction(self.showUndoViewAction)
+
+    @Slot(QAction)
+    def _onColorAction(self, action):
+        color_type = action.data()
+        if color_type == 'even':
+            self.setEvenRowColor()
+        elif color_type == 'odd':
+            self.setOddRowColor()
+        elif color_type == 'bg':
+            self.setBackgroundColor()
+
+    @Slot()
+    def _populateHelpMenu(self):
+        if not self.helpMenu.isEmpty():
+            return
+        self.aboutAction = QAction("About", self)
+        self.aboutAction.triggered.connect(self.about)
+        self.helpMenu.addAction(self.aboutAction)
+
     def createToolBars(self):
         editToolBar = QToolBar("Edit", self)
-        editToolBar.addAction(self.undoAction)
-        editToolBar.addAction(self.redoAction)
+        editToolBar.addActions([self.undoAction, self.redoAction])
         self.addToolBar(editToolBar)
 
+    @Slot()
     def setEvenRowColor(self):
-        color = QColorDialog.getColor()
-        if color.isValid():
-            old_color = self.model.even_row_color
-            command = SetRowColorCommand(self.model, 'even', old_color, color)
-            self.undoStack.push(command)
+        self._openColorDialog(self.model.even_row_color, self._pushEvenRowColor)
+
+    def _pushEvenRowColor(self, color):
+        old_color = self.model.even_row_color
+        if color == old_color:
+            return
+        command = SetRowColorCommand(self.model, 'even', old_color, color)
+        self.undoStack.push(command)
 
+    @Slot()
     def setOddRowColor(self):
-        color = QColorDialog.getColor()
-        if color.isValid():
-            old_color = self.model.odd_row_color
-            command = SetRowColorCommand(self.model, 'odd', old_color, color)
-            self.undoStack.push(command)
+        self._openColorDialog(self.model.odd_row_color, self._pushOddRowColor)
+
+    def _pushOddRowColor(self, color):
+        old_color = self.model.odd_row_color
+        if color == old_color:
+            return
+        command = SetRowColorCommand(self.model, 'odd', old_color, color)
+        self.undoStack.push(command)
 
+    @Slot()
     def setBackgroundColor(self):
-        color = QColorDialog.getColor()
-        if color.isValid():
-            old_color = self.palette().window().color()
-            command = SetBackgroundColorCommand(self, old_color, color)
-            self.undoStack.push(command)
+        self._openColorDialog(self._current_bg_color, self._pushBackgroundColor)
+
+    def _pushBackgroundColor(self, color):
+        old_color = self._current_bg_color
+        if color.rgba() == old_color.rgba():
+            return
+        command = SetBackgroundColorCommand(self, old_color, color)
+        self.undoStack.push(command)
 
+    def _openColorDialog(self, initial_color, on_selected):
+        # One window-modal dialog is kept and opened without blocking the event loop
+        if self._colorDialog is None:
+            self._colorDialog = QColorDialog(self)
+            self._colorDialog.colorSelected.connect(self._onColorSelected)
+        self._colorSelectedHandler = on_selected
+        self._colorDialog.setCurrentColor(initial_color)
+        self._colorDialog.open()
+
+    @Slot(QColor)
+    def _onColorSelected(self, color):
+        handler = self._colorSelectedHandler
+        self._colorSelectedHandler = None
+        if handler is not None and color.isValid():
+            handler(color)
+
+    @Slot(QColor)
     def applyBackgroundColor(self, color):
-        palette = self.palette()
-        palette.setColor(self.backgroundRole(), color)
-        self.setPalette(palette)
+        self._current_bg_color = color
+        self._palette.setColor(self._bg_role, color)
+        self.setPalette(self._palette)
 
+    @Slot()
     def about(self):
         QMessageBox.about(self, "About Undo Framework", "This demonstrates the use of the QUndoStack class.")
-=
+
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)